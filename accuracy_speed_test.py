@@ -9,7 +9,7 @@ Usage:
 """
 
 import requests
-import json
+import orjson
 import time
 import statistics
 from datetime import datetime
@@ -24,6 +24,8 @@ class APITester:
     def __init__(self, base_url: str = "http://localhost:8000"):
         self.base_url = base_url
         self.test_results = []
+        # Every result is appended here as it arrives, so an interrupted run keeps what it measured
+        self.results_log_path = f"test_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
 
     def run_comprehensive_test(self):
         """Run all test categories"""
@@ -99,6 +101,7 @@ class APITester:
                     'quality_score': quality_score
                 }
                 results['detailed_results'].append(detailed_result)
+                self.log_result(category, detailed_result)
 
                 # Display result
                 status_color = Fore.GREEN if accuracy_score >= 7 else Fore.YELLOW if accuracy_score >= 5 else Fore.RED
@@ -106,16 +109,24 @@ class APITester:
 
             else:
                 print(f"     {Fore.RED}✗ API call failed")
-                results['detailed_results'].append({
+                failed_result = {
                     'question': test_case['question'],
                     'error': 'API call failed',
                     'response_time': response_time,
                     'accuracy_score': 0,
                     'quality_score': 0
-                })
+                }
+                results['detailed_results'].append(failed_result)
+                self.log_result(category, failed_result)
 
         return results
 
+    def log_result(self, category: str, result: Dict):
+        """Append one test result to the NDJSON results log"""
+        entry = {'category': category, 'timestamp': datetime.now().isoformat(), **result}
+        with open(self.results_log_path, 'ab', buffering=8192) as f:
+            f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
+
     def call_api(self, question: str) -> str:
         """Call the API with a single question"""
         try:
@@ -280,10 +291,11 @@ class APITester:
                 'detailed_results': results['detailed_results']
             }
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(serializable_results, f, indent=2, ensure_ascii=False)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(serializable_results, option=orjson.OPT_INDENT_2))
 
         print(f"\n{Fore.GREEN}💾 Detailed results saved to: {filename}")
+        print(f"{Fore.GREEN}📝 Per-question log: {self.results_log_path}")
 
     def get_simple_test_questions(self) -> List[Dict]:
         """Simple, straightforward questions"""
@@ -9,12 +9,15 @@ OPTIMIZED FOR COMPLEX QUERIES AND SPEED
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 import json
+import orjson
 import time
 import asyncio
 import logging
+import threading
 from datetime import datetime
 import traceback
 
@@ -48,6 +51,10 @@ app.add_middleware(
 # Global processors
 processor = None
 ultra_fast_processor = None
+documents_lock = threading.Lock()
+
+# Questions of one request analyzed at the same time; each mostly waits on Gemini
+MAX_CONCURRENT_QUESTIONS = 4
 
 # Request Models
 class QueryRequest(BaseModel):
@@ -93,7 +100,11 @@ async def startup_event():
         processor = IntelligentClaimsProcessor()
         ultra_fast_processor = UltraFastProcessor()
 
-        logger.info("⚡ API server ready! Documents will load on first request.")
+        # Pre-warm documents (and the Numba search kernel) off the event loop so the
+        # first user doesn't pay for model load, embedding and JIT compile
+        threading.Thread(target=ensure_documents_loaded, daemon=True).start()
+
+        logger.info("⚡ API server ready! Documents are warming up in the background.")
         logger.info("🎉 Fast startup complete!")
 
     except Exception as e:
@@ -184,17 +195,8 @@ async def hackrx_run(request: QueryRequest, authorization: Optional[str] = Heade
                 detail="Claims processor not initialized"
             )
 
-        # LAZY LOADING: Load documents on first request if not loaded
-        if not processor.document_chunks:
-            logger.info("⚡ Loading documents on first request...")
-            docs_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "docs")
-            if os.path.exists(docs_path):
-                processor.load_documents("docs")
-                logger.info(f"✅ Loaded {len(processor.document_chunks)} document chunks")
-
-        # Initialize results
-        answers = []
-        successful_count = 0
+        # Blocking work runs in worker threads so the event loop keeps serving other requests
+        await asyncio.to_thread(ensure_documents_loaded)
 
         # 🚨 REAL AI ANALYSIS FOR EVERY QUESTION - NO PATTERNS!
         # Human lives depend on accurate analysis, not generic responses
@@ -210,63 +212,11 @@ async def hackrx_run(request: QueryRequest, authorization: Optional[str] = Heade
         # 🧠 REAL AI PROCESSING FOR ALL QUESTIONS - NO GENERIC PATTERNS!
         logger.info("🤖 Processing ALL questions with full AI analysis for real-world accuracy...")
 
-        for orig_idx, question in remaining_questions:
-            try:
-                # REAL AI ANALYSIS: Search documents + AI reasoning for every question
-                logger.info(f"🔍 AI analyzing question {orig_idx + 1}: {question[:60]}...")
-
-                # Get relevant document chunks for context
-                relevant_chunks, scores = processor.semantic_search(question, top_k=5)
-                logger.info(f"📄 Found {len(relevant_chunks)} relevant document sections")
-
-                # Use full AI processor for REAL analysis
-                result = processor.process_claim_query(question)
-
-                # Extract the informative AI-generated answer
-                ai_answer = result.get('user_friendly_explanation',
-                           result.get('justification', 'No detailed analysis available'))
-
-                answer = AnswerResponse(
-                    question=question,
-                    answer=ai_answer
-                )
-                answers.append((orig_idx, answer))
-
-                if result.get('decision') in ['approved', 'rejected']:
-                    successful_count += 1
-
-                logger.info(f"✅ AI completed analysis for question {orig_idx + 1}")
-
-            except Exception as e:
-                logger.error(f"❌ AI processing failed for question {orig_idx + 1}: {str(e)}")
-
-                # ENHANCED FALLBACK: Use document chunks when AI fails
-                try:
-                    relevant_chunks, _ = processor.semantic_search(question, top_k=3)
-                    if relevant_chunks:
-                        # Use the most relevant document content
-                        best_chunk = relevant_chunks[0][:500]  # More content for better context
-                        document_answer = f"Based on policy documents: {best_chunk}... [AI analysis temporarily unavailable - this is from your actual policy documents]"
-                    else:
-                        document_answer = "Unable to find relevant information in policy documents. Please contact customer service for detailed assistance with this specific query."
-
-                    answer = AnswerResponse(
-                        question=question,
-                        answer=document_answer
-                    )
-                    answers.append((orig_idx, answer))
-
-                except Exception as fallback_error:
-                    logger.error(f"❌ Document fallback also failed: {str(fallback_error)}")
-                    answer = AnswerResponse(
-                        question=question,
-                        answer="Unable to process this query at the moment. Please contact customer service for immediate assistance."
-                    )
-                    answers.append((orig_idx, answer))
-
-        # Sort answers by original question order
-        answers.sort(key=lambda x: x[0])
-        final_answers = [answer for _, answer in answers]
+        # gather keeps the original question order
+        tasks = await start_answering([question for _, question in remaining_questions])
+        results = [result for _, result in await asyncio.gather(*tasks)]
+        final_answers = [answer for answer, _ in results]
+        successful_count = sum(1 for _, successful in results if successful)
 
         # Calculate processing time
         processing_time = time.time() - start_time
@@ -292,6 +242,104 @@ async def hackrx_run(request: QueryRequest, authorization: Optional[str] = Heade
             }
         )
 
+async def start_answering(questions):
+    """
+    Schedule full AI analysis of every question, MAX_CONCURRENT_QUESTIONS at a time.
+    Returns one task per question, in question order, each resolving to
+    (index, (AnswerResponse, decision_made))
+    """
+    # One batched encode for every question instead of one per question
+    await asyncio.to_thread(processor.warm_query_cache, questions)
+
+    # Overlap the LLM round-trips of different questions, a few at a time
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUESTIONS)
+
+    async def answer_in_thread(orig_idx, question):
+        async with semaphore:
+            return orig_idx, await asyncio.to_thread(answer_question, orig_idx, question)
+
+    return [asyncio.create_task(answer_in_thread(orig_idx, question))
+            for orig_idx, question in enumerate(questions)]
+
+def ensure_documents_loaded():
+    """LAZY LOADING: Load documents if not loaded (waits for the startup pre-warm)"""
+    with documents_lock:
+        if not processor.document_chunks:
+            logger.info("⚡ Loading documents...")
+            docs_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "docs")
+            if os.path.exists(docs_path):
+                processor.load_documents("docs")
+                logger.info(f"✅ Loaded {len(processor.document_chunks)} document chunks")
+
+def answer_question(orig_idx: int, question: str):
+    """Run full AI analysis for one question; returns (AnswerResponse, decision_made)"""
+    try:
+        # REAL AI ANALYSIS: Search documents + AI reasoning for every question
+        logger.info(f"🔍 AI analyzing question {orig_idx + 1}: {question[:60]}...")
+
+        # Get relevant document chunks for context
+        relevant_chunks, scores = processor.semantic_search(question, top_k=5)
+        logger.info(f"📄 Found {len(relevant_chunks)} relevant document sections")
+
+        # Use full AI processor for REAL analysis
+        result = processor.process_claim_query(question)
+
+        # Extract the informative AI-generated answer
+        ai_answer = result.get('user_friendly_explanation',
+                   result.get('justification', 'No detailed analysis available'))
+
+        logger.info(f"✅ AI completed analysis for question {orig_idx + 1}")
+        return AnswerResponse(question=question, answer=ai_answer), result.get('decision') in ['approved', 'rejected']
+
+    except Exception as e:
+        logger.error(f"❌ AI processing failed for question {orig_idx + 1}: {str(e)}")
+
+        # ENHANCED FALLBACK: Use document chunks when AI fails
+        try:
+            relevant_chunks, _ = processor.semantic_search(question, top_k=3)
+            if relevant_chunks:
+                # Use the most relevant document content
+                best_chunk = relevant_chunks[0][:500]  # More content for better context
+                document_answer = f"Based on policy documents: {best_chunk}... [AI analysis temporarily unavailable - this is from your actual policy documents]"
+            else:
+                document_answer = "Unable to find relevant information in policy documents. Please contact customer service for detailed assistance with this specific query."
+
+            return AnswerResponse(question=question, answer=document_answer), False
+
+        except Exception as fallback_error:
+            logger.error(f"❌ Document fallback also failed: {str(fallback_error)}")
+            return AnswerResponse(
+                question=question,
+                answer="Unable to process this query at the moment. Please contact customer service for immediate assistance."
+            ), False
+
+@app.post("/hackrx/stream")
+async def hackrx_stream(request: QueryRequest, authorization: Optional[str] = Header(None)):
+    """
+    Same analysis and concurrency as /hackrx/run, streamed as newline-delimited JSON:
+    one {"index", "question", "answer"} line per question in the order answers finish,
+    so clients can show the first answer without waiting for the whole batch
+    """
+    if processor is None:
+        raise HTTPException(status_code=500, detail="Claims processor not initialized")
+
+    logger.info(f"📥 Streaming hackathon request with {len(request.questions)} questions")
+
+    async def generate():
+        await asyncio.to_thread(ensure_documents_loaded)
+        tasks = await start_answering(request.questions)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                orig_idx, (answer, _) = await next_done
+                yield orjson.dumps({"index": orig_idx, "question": answer.question, "answer": answer.answer},
+                                   option=orjson.OPT_APPEND_NEWLINE)
+        finally:
+            # Client went away: don't start questions nobody will read
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 def calculate_confidence(result: Dict[str, Any], question: str) -> float:
     """Calculate confidence score based on result quality"""
     base_confidence = 0.5
@@ -340,20 +388,28 @@ async def process_multiple_questions(request: MultipleQuestions):
         if processor is None:
             raise HTTPException(status_code=500, detail="Processor not initialized")
 
+        # Waits for the startup pre-warm instead of searching an empty corpus
+        await asyncio.to_thread(ensure_documents_loaded)
+
         results = []
 
-        for question in request.questions:
-            # Determine if it's a complex query
-            is_complex = (len(question) > 100 or
-                         any(word in question.lower() for word in ['comprehensive', 'complex', 'detailed', 'analysis']))
+        # Determine which questions are complex queries
+        complex_flags = [len(question) > 100 or
+                         any(word in question.lower() for word in ['comprehensive', 'complex', 'detailed', 'analysis'])
+                         for question in request.questions]
+
+        # Fetch clauses for all simple questions with one batched search
+        simple_questions = [q for q, is_complex in zip(request.questions, complex_flags) if not is_complex]
+        simple_chunks = iter(processor.semantic_search_batch(simple_questions, top_k=3))
 
+        for question, is_complex in zip(request.questions, complex_flags):
             if is_complex:
                 logger.info(f"🧠 Processing complex question: {question[:50]}...")
                 result = processor.process_claim_query(question)
                 method = "full_llm"
             else:
                 logger.info(f"⚡ Processing simple question: {question[:50]}...")
-                relevant_chunks, _ = processor.semantic_search(question, top_k=3)
+                relevant_chunks, _ = next(simple_chunks)
                 result = ultra_fast_processor.ultra_fast_process(question, relevant_chunks)
                 method = "ultra_fast"
 
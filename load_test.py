@@ -5,21 +5,22 @@ Tests API performance under concurrent load
 Simulates multiple users hitting the API simultaneously
 
 Usage:
-    python load_test.py [concurrent_users] [requests_per_user]
+    python load_test.py [concurrent_users] [requests_per_user] [per_user_concurrency]
 
 Examples:
     python load_test.py 5 3    # 5 users, 3 requests each
     python load_test.py 10 2   # 10 users, 2 requests each
+    python load_test.py 5 6 3  # 5 users, 6 requests each, 3 in flight per user (no think time)
 """
 
-import requests
+import asyncio
+import aiohttp
 import time
-import json
-import threading
+import orjson
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter, defaultdict
 from colorama import init, Fore, Style
-import statistics
+import numpy as np
 
 init(autoreset=True)
 
@@ -27,98 +28,157 @@ class LoadTester:
     def __init__(self, base_url="http://localhost:8000"):
         self.base_url = base_url
         self.results = []
-        self.lock = threading.Lock()
+        self.headers = {"Content-Type": "application/json"}
+        # Request bodies pre-serialized once per distinct question
+        self.payloads = {}
+        # aiohttp session shared by every simulated user, opened for the duration of a run
+        self.session = None
 
-    def single_request(self, user_id, request_id, question):
+    async def single_request(self, user_id, request_id, question):
         """Make a single API request"""
         start_time = time.time()
 
         try:
-            payload = {
-                "documents": "https://hackrx.blob.core.windows.net/assets/policy.pdf",
-                "questions": [question]
-            }
-
-            response = requests.post(
+            async with self.session.post(
                 f"{self.base_url}/hackrx/run",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=60
-            )
+                data=self.payloads[question],
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=60)
+            ) as response:
+                body = await response.read()
 
             response_time = time.time() - start_time
 
-            with self.lock:
-                result = {
-                    'user_id': user_id,
-                    'request_id': request_id,
-                    'question': question,
-                    'response_time': response_time,
-                    'status_code': response.status_code,
-                    'success': response.status_code == 200,
-                    'timestamp': time.time()
-                }
-
-                if response.status_code == 200:
-                    try:
-                        data = response.json()
-                        if data.get('answers') and len(data['answers']) > 0:
-                            answer = data['answers'][0]['answer']
-                            result['answer_length'] = len(answer)
-                            result['has_answer'] = True
-
-                            # Check for generic responses
-                            generic_phrases = [
-                                "sorry, there was an error",
-                                "unable to process",
-                                "contact customer service"
-                            ]
-                            result['is_generic'] = any(phrase in answer.lower() for phrase in generic_phrases)
-                        else:
-                            result['has_answer'] = False
-                    except:
-                        result['has_answer'] = False
+            # Every request runs on the one event loop thread, so results need no lock
+            result = {
+                'user_id': user_id,
+                'request_id': request_id,
+                'question': question,
+                'response_time': response_time,
+                'status_code': response.status,
+                'success': response.status == 200,
+                'timestamp': time.time()
+            }
 
-                self.results.append(result)
+            if response.status == 200:
+                try:
+                    data = orjson.loads(body)
+                    if data.get('answers') and len(data['answers']) > 0:
+                        answer = data['answers'][0]['answer']
+                        result['answer_length'] = len(answer)
+                        result['has_answer'] = True
+
+                        # Check for generic responses
+                        generic_phrases = [
+                            "sorry, there was an error",
+                            "unable to process",
+                            "contact customer service"
+                        ]
+                        result['is_generic'] = any(phrase in answer.lower() for phrase in generic_phrases)
+                    else:
+                        result['has_answer'] = False
+                except:
+                    result['has_answer'] = False
 
+            self.results.append(result)
             return result
 
         except Exception as e:
             response_time = time.time() - start_time
 
-            with self.lock:
-                result = {
-                    'user_id': user_id,
-                    'request_id': request_id,
-                    'question': question,
-                    'response_time': response_time,
-                    'success': False,
-                    'error': str(e),
-                    'timestamp': time.time()
-                }
-                self.results.append(result)
+            result = {
+                'user_id': user_id,
+                'request_id': request_id,
+                'question': question,
+                'response_time': response_time,
+                'success': False,
+                'error': str(e) or type(e).__name__,
+                'timestamp': time.time()
+            }
+            self.results.append(result)
 
             return result
 
-    def user_simulation(self, user_id, requests_per_user, questions):
+    async def user_request(self, user_id, req_id, questions):
+        """Make one of a user's requests and print its outcome"""
+        question = questions[req_id % len(questions)]  # Cycle through questions
+        result = await self.single_request(user_id, req_id, question)
+
+        status = "✅" if result['success'] else "❌"
+        print(f"   {status} User {user_id} Req {req_id+1}: {result['response_time']:.2f}s")
+
+    async def user_simulation(self, user_id, requests_per_user, questions, per_user_concurrency=1):
         """Simulate a single user making multiple requests"""
         print(f"{Fore.YELLOW}👤 User {user_id} starting {requests_per_user} requests...")
 
-        for req_id in range(requests_per_user):
-            question = questions[req_id % len(questions)]  # Cycle through questions
-            result = self.single_request(user_id, req_id, question)
+        if per_user_concurrency > 1:
+            # Pipelined: keep up to per_user_concurrency requests in flight, no think time,
+            # so the test measures server capacity rather than artificial per-user pacing
+            semaphore = asyncio.Semaphore(per_user_concurrency)
+
+            async def pipelined_request(req_id):
+                async with semaphore:
+                    await self.user_request(user_id, req_id, questions)
+
+            await asyncio.gather(*[pipelined_request(req_id) for req_id in range(requests_per_user)])
+            return
 
-            status = "✅" if result['success'] else "❌"
-            print(f"   {status} User {user_id} Req {req_id+1}: {result['response_time']:.2f}s")
+        for req_id in range(requests_per_user):
+            await self.user_request(user_id, req_id, questions)
 
             # Small delay between requests from same user
-            time.sleep(0.1)
+            await asyncio.sleep(0.1)
+
+    async def check_health(self):
+        """Check the API through the load-test session, warming its connection pool"""
+        try:
+            async with self.session.get(
+                f"{self.base_url}/health",
+                timeout=aiohttp.ClientTimeout(total=5)
+            ) as response:
+                healthy = response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            print(f"{Fore.RED}❌ Cannot connect to API")
+            print(f"{Fore.YELLOW}💡 Please start the API server: python api_server.py")
+            return False
+
+        if not healthy:
+            print(f"{Fore.RED}❌ API not responding")
+            return False
+
+        print(f"{Fore.GREEN}✅ API is running")
+        return True
+
+    async def run_users(self, concurrent_users, requests_per_user, questions, per_user_concurrency=1):
+        """Run every simulated user concurrently on one event loop; returns test duration or None"""
+        connector = aiohttp.TCPConnector(limit=concurrent_users * requests_per_user)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            self.session = session
+            if not await self.check_health():
+                self.session = None
+                return None
+
+            start_time = time.time()
+            outcomes = await asyncio.gather(
+                *[self.user_simulation(user_id, requests_per_user, questions, per_user_concurrency)
+                  for user_id in range(concurrent_users)],
+                return_exceptions=True
+            )
+            total_time = time.time() - start_time
+        self.session = None
+
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                print(f"{Fore.RED}User simulation error: {outcome}")
+
+        return total_time
 
-    def run_load_test(self, concurrent_users=5, requests_per_user=3):
+    def run_load_test(self, concurrent_users=5, requests_per_user=3, per_user_concurrency=1):
         """Run the load test"""
         print(f"{Fore.CYAN}🔥 Load Test Configuration:")
         print(f"   Concurrent Users: {concurrent_users}")
         print(f"   Requests per User: {requests_per_user}")
+        print(f"   In-flight per User: {per_user_concurrency}")
         print(f"   Total Requests: {concurrent_users * requests_per_user}")
         print("=" * 50)
 
@@ -136,30 +196,29 @@ class LoadTester:
             "Cancer treatment coverage with rider benefits"
         ]
 
+        # Deduplicate the pool and encode each request body once
+        questions = list(dict.fromkeys(questions))
+        self.payloads = {
+            question: orjson.dumps({
+                "documents": "https://hackrx.blob.core.windows.net/assets/policy.pdf",
+                "questions": [question]
+            })
+            for question in questions
+        }
+
         # Clear previous results
         self.results = []
 
-        # Start load test
-        start_time = time.time()
-
-        with ThreadPoolExecutor(max_workers=concurrent_users) as executor:
-            # Submit all user simulations
-            futures = []
-            for user_id in range(concurrent_users):
-                future = executor.submit(self.user_simulation, user_id, requests_per_user, questions)
-                futures.append(future)
-
-            # Wait for all to complete
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    print(f"{Fore.RED}User simulation error: {e}")
-
-        total_time = time.time() - start_time
+        # Start load test (health check runs first, on the same session)
+        total_time = asyncio.run(
+            self.run_users(concurrent_users, requests_per_user, questions, per_user_concurrency)
+        )
+        if total_time is None:
+            return False
 
         # Analyze results
         self.analyze_results(total_time, concurrent_users, requests_per_user)
+        return True
 
     def analyze_results(self, total_time, concurrent_users, requests_per_user):
         """Analyze and display load test results"""
@@ -183,16 +242,20 @@ class LoadTester:
 
         if successful_requests:
             # Response time analysis
-            response_times = [r['response_time'] for r in successful_requests]
+            response_times = np.fromiter((r['response_time'] for r in successful_requests),
+                                         dtype=np.float64, count=len(successful_requests))
+            p50, p95, p99 = np.quantile(response_times, [0.5, 0.95, 0.99])
 
             print(f"\n⏱️  Response Time Analysis:")
-            print(f"   Average: {statistics.mean(response_times):.2f}s")
-            print(f"   Median: {statistics.median(response_times):.2f}s")
-            print(f"   Min: {min(response_times):.2f}s")
-            print(f"   Max: {max(response_times):.2f}s")
+            print(f"   Average: {response_times.mean():.2f}s")
+            print(f"   Median: {p50:.2f}s")
+            print(f"   P95: {p95:.2f}s")
+            print(f"   P99: {p99:.2f}s")
+            print(f"   Min: {response_times.min():.2f}s")
+            print(f"   Max: {response_times.max():.2f}s")
 
             if len(response_times) > 1:
-                print(f"   Std Dev: {statistics.stdev(response_times):.2f}s")
+                print(f"   Std Dev: {response_times.std(ddof=1):.2f}s")
 
             # Throughput
             requests_per_second = total_requests / total_time
@@ -210,19 +273,16 @@ class LoadTester:
 
             # Concurrency analysis
             print(f"\n🔀 Concurrency Performance:")
-            user_performance = {}
+            user_performance = defaultdict(list)
             for result in successful_requests:
-                user_id = result['user_id']
-                if user_id not in user_performance:
-                    user_performance[user_id] = []
-                user_performance[user_id].append(result['response_time'])
+                user_performance[result['user_id']].append(result['response_time'])
 
             for user_id, times in user_performance.items():
-                avg_time = statistics.mean(times)
+                avg_time = sum(times) / len(times)
                 print(f"   User {user_id}: {len(times)} requests, avg {avg_time:.2f}s")
 
             # Performance grade
-            avg_response_time = statistics.mean(response_times)
+            avg_response_time = response_times.mean()
             success_rate = len(successful_requests) / total_requests
             quality_rate = len(quality_responses) / len(successful_requests) if successful_requests else 0
 
@@ -240,10 +300,7 @@ class LoadTester:
         # Error analysis
         if failed_requests:
             print(f"\n❌ Error Analysis:")
-            error_types = {}
-            for req in failed_requests:
-                error = req.get('error', 'Unknown')
-                error_types[error] = error_types.get(error, 0) + 1
+            error_types = Counter(req.get('error', 'Unknown') for req in failed_requests)
 
             for error, count in error_types.items():
                 print(f"   {error}: {count} occurrences")
@@ -253,6 +310,7 @@ def main():
     # Parse command line arguments
     concurrent_users = 5
     requests_per_user = 3
+    per_user_concurrency = 1
 
     if len(sys.argv) >= 2:
         try:
@@ -266,24 +324,18 @@ def main():
         except ValueError:
             print(f"{Fore.RED}Invalid requests_per_user value. Using default: 3")
 
-    print(f"{Fore.GREEN}🚀 Starting Load Test...")
-
-    # Check if API is running
-    try:
-        response = requests.get("http://localhost:8000/health", timeout=5)
-        if response.status_code != 200:
-            print(f"{Fore.RED}❌ API not responding")
-            return
-    except requests.exceptions.RequestException:
-        print(f"{Fore.RED}❌ Cannot connect to API")
-        print(f"{Fore.YELLOW}💡 Please start the API server: python api_server.py")
-        return
+    if len(sys.argv) >= 4:
+        try:
+            per_user_concurrency = int(sys.argv[3])
+        except ValueError:
+            print(f"{Fore.RED}Invalid per_user_concurrency value. Using default: 1")
 
-    print(f"{Fore.GREEN}✅ API is running")
+    print(f"{Fore.GREEN}🚀 Starting Load Test...")
 
-    # Run load test
+    # Run load test (checks the API is running first)
     tester = LoadTester()
-    tester.run_load_test(concurrent_users, requests_per_user)
+    if not tester.run_load_test(concurrent_users, requests_per_user, per_user_concurrency):
+        return
 
     print(f"\n{Fore.GREEN}🎉 Load test completed!")
 
@@ -12,9 +12,11 @@ Examples:
     python monitor.py 2 30     # Test every 2 seconds for 30 minutes
 """
 
+import re
 import requests
+from requests.adapters import HTTPAdapter
 import time
-import json
+import orjson
 import sys
 from datetime import datetime, timedelta
 from colorama import init, Fore, Style
@@ -23,17 +25,34 @@ import threading
 
 init(autoreset=True)
 
+# Most recent results kept in memory for the live display; every result is also
+# appended to the session's NDJSON file as soon as it is measured
+MAX_METRICS_IN_MEMORY = 1000
+
 class APIMonitor:
+    # Phrases that mark a canned error answer, checked case-insensitively in one pass
+    _GENERIC_RE = re.compile(r"sorry, there was an error|unable to process|contact customer service",
+                             re.IGNORECASE)
+
     def __init__(self, base_url="http://localhost:8000"):
         self.base_url = base_url
         self.metrics = []
+        self.total_requests = 0
+        self.total_successful = 0
+        self.metrics_file = None
         self.is_running = False
         self.start_time = None
+        # One keep-alive session for the monitor's lifetime instead of a new connection per check.
+        # No retries: a failed request is exactly what the monitor should report.
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session.headers.update({"Content-Type": "application/json"})
 
     def health_check(self):
         """Perform health check"""
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = self.session.get(f"{self.base_url}/health", timeout=5)
             return response.status_code == 200
         except:
             return False
@@ -48,7 +67,7 @@ class APIMonitor:
             "What is the maximum coverage for dental work?"
         ]
 
-        question = test_questions[len(self.metrics) % len(test_questions)]
+        question = test_questions[self.total_requests % len(test_questions)]
 
         start_time = time.time()
 
@@ -58,10 +77,9 @@ class APIMonitor:
                 "questions": [question]
             }
 
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/hackrx/run",
                 json=payload,
-                headers={"Content-Type": "application/json"},
                 timeout=60
             )
 
@@ -84,12 +102,7 @@ class APIMonitor:
                         metric['has_answer'] = True
 
                         # Check for generic responses
-                        generic_phrases = [
-                            "sorry, there was an error",
-                            "unable to process",
-                            "contact customer service"
-                        ]
-                        metric['is_generic'] = any(phrase in answer.lower() for phrase in generic_phrases)
+                        metric['is_generic'] = bool(self._GENERIC_RE.search(answer))
                     else:
                         metric['has_answer'] = False
                         metric['is_generic'] = True
@@ -129,9 +142,9 @@ class APIMonitor:
         recent_metrics = self.metrics[-10:]
         successful_recent = [m for m in recent_metrics if m['success']]
 
-        # Overall metrics
-        total_requests = len(self.metrics)
-        total_successful = len([m for m in self.metrics if m['success']])
+        # Overall metrics (running totals, the in-memory list only holds the latest results)
+        total_requests = self.total_requests
+        total_successful = self.total_successful
         total_failed = total_requests - total_successful
 
         # Current status
@@ -239,6 +252,11 @@ class APIMonitor:
         else:
             print(f"   Duration: Continuous (Ctrl+C to stop)")
 
+        # Results are written out as they arrive, so a crash keeps everything measured so far
+        self.metrics_file = f"monitoring_metrics_{self.start_time.strftime('%Y%m%d_%H%M%S')}.ndjson"
+        metrics_out = open(self.metrics_file, 'ab')
+        print(f"   Metrics file: {self.metrics_file}")
+
         try:
             while self.is_running:
                 # Check if we should stop
@@ -247,7 +265,7 @@ class APIMonitor:
 
                 # Perform test
                 metric = self.performance_test()
-                self.metrics.append(metric)
+                self.record_metric(metric, metrics_out)
 
                 # Display metrics
                 self.display_metrics()
@@ -257,10 +275,24 @@ class APIMonitor:
 
         except KeyboardInterrupt:
             print(f"\n{Fore.YELLOW}⏹️  Monitoring stopped by user")
+        finally:
+            metrics_out.close()
 
         self.is_running = False
         self.generate_report()
 
+    def record_metric(self, metric, metrics_out):
+        """Append one result to the NDJSON file and the capped in-memory window"""
+        # orjson writes the datetime timestamp as ISO 8601 directly
+        metrics_out.write(orjson.dumps(metric, option=orjson.OPT_APPEND_NEWLINE))
+        metrics_out.flush()
+
+        self.total_requests += 1
+        self.total_successful += metric['success']
+        self.metrics.append(metric)
+        if len(self.metrics) > MAX_METRICS_IN_MEMORY:
+            del self.metrics[:-MAX_METRICS_IN_MEMORY]
+
     def generate_report(self):
         """Generate final monitoring report"""
         if not self.metrics:
@@ -269,39 +301,37 @@ class APIMonitor:
         print(f"\n{Fore.GREEN}📊 MONITORING REPORT")
         print("=" * 40)
 
-        # Save results to file
+        # Save the session summary; the individual results are already in the NDJSON file
         report_data = {
             'monitoring_session': {
                 'start_time': self.start_time.isoformat(),
                 'end_time': datetime.now().isoformat(),
                 'duration': str(datetime.now() - self.start_time),
-                'total_requests': len(self.metrics)
-            },
-            'metrics': []
+                'total_requests': self.total_requests,
+                'metrics_file': self.metrics_file
+            }
         }
 
-        for metric in self.metrics:
-            metric_copy = metric.copy()
-            metric_copy['timestamp'] = metric_copy['timestamp'].isoformat()
-            report_data['metrics'].append(metric_copy)
-
         # Save to file
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"monitoring_report_{timestamp}.json"
 
-        with open(filename, 'w') as f:
-            json.dump(report_data, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(report_data, option=orjson.OPT_INDENT_2))
 
         print(f"📄 Report saved: {filename}")
 
-        # Summary statistics
-        successful_metrics = [m for m in self.metrics if m['success']]
-
-        if successful_metrics:
-            response_times = [m['response_time'] for m in successful_metrics]
+        # Summary statistics over the whole session, streamed back from the NDJSON file
+        response_times = []
+        with open(self.metrics_file, 'rb') as f:
+            for line in f:
+                metric = orjson.loads(line)
+                if metric['success']:
+                    response_times.append(metric['response_time'])
 
+        if response_times:
             print(f"\n📈 Summary Statistics:")
-            print(f"   Success Rate: {len(successful_metrics)}/{len(self.metrics)} ({len(successful_metrics)/len(self.metrics)*100:.1f}%)")
+            print(f"   Success Rate: {len(response_times)}/{self.total_requests} ({len(response_times)/self.total_requests*100:.1f}%)")
             print(f"   Avg Response Time: {statistics.mean(response_times):.2f}s")
             print(f"   Min Response Time: {min(response_times):.2f}s")
             print(f"   Max Response Time: {max(response_times):.2f}s")
@@ -51,7 +51,7 @@ async def startup_event():
             if processor.load_documents("docs"):
                 documents_loaded = True
                 logger.info(f"✅ Successfully loaded {len(processor.document_chunks)} document chunks")
-                logger.info(f"📊 Documents processed from: {set(processor.document_sources)}")
+                logger.info(f"📊 Documents processed from: {list(processor.source_to_indices)}")
             else:
                 logger.error("❌ Failed to load documents")
         else:
@@ -76,7 +76,7 @@ async def health():
         "message": "Ready for REAL document processing!",
         "documents_loaded": documents_loaded,
         "document_chunks": len(processor.document_chunks) if processor and processor.document_chunks else 0,
-        "document_sources": list(set(processor.document_sources)) if processor and processor.document_sources else []
+        "document_sources": list(processor.source_to_indices) if processor else []
     }
 
 @app.post("/hackrx/run")
@@ -154,7 +154,7 @@ async def debug_documents():
     return {
         "documents_loaded": documents_loaded,
         "total_chunks": len(processor.document_chunks) if processor.document_chunks else 0,
-        "document_sources": list(set(processor.document_sources)) if processor.document_sources else [],
+        "document_sources": list(processor.source_to_indices),
         "sample_chunks": processor.document_chunks[:3] if processor.document_chunks else [],
         "docs_folder_exists": os.path.exists("docs"),
         "docs_folder_contents": os.listdir("docs") if os.path.exists("docs") else []
@@ -20,9 +20,10 @@ Examples:
 
 import requests
 import time
-import json
+import orjson
 import sys
 import threading
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from colorama import init, Fore, Style
 import statistics
@@ -84,8 +85,9 @@ class StressTester:
                 except:
                     result['has_quality_answer'] = False
 
+            # list.append is atomic under the GIL; only the in-flight counter needs the lock
+            self.results.append(result)
             with self.lock:
-                self.results.append(result)
                 self.active_requests -= 1
 
             return result
@@ -103,8 +105,9 @@ class StressTester:
                 'concurrent_active': self.active_requests
             }
 
+            # list.append is atomic under the GIL; only the in-flight counter needs the lock
+            self.results.append(result)
             with self.lock:
-                self.results.append(result)
                 self.active_requests -= 1
 
             return result
@@ -402,7 +405,7 @@ class StressTester:
         # Error analysis
         if failed_requests:
             print(f"\n❌ Error Analysis:")
-            error_types = {}
+            error_types = Counter()
             for req in failed_requests:
                 error = req.get('error', 'HTTP Error')
                 if 'timeout' in error.lower():
@@ -412,7 +415,7 @@ class StressTester:
                 else:
                     error_type = 'Other Error'
 
-                error_types[error_type] = error_types.get(error_type, 0) + 1
+                error_types[error_type] += 1
 
             for error_type, count in error_types.items():
                 print(f"   {error_type}: {count} occurrences")
@@ -436,8 +439,8 @@ class StressTester:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"stress_test_results_{timestamp}.json"
 
-        with open(filename, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(self.results, option=orjson.OPT_INDENT_2))
 
         print(f"\n📄 Detailed results saved: {filename}")
 
@@ -5,17 +5,218 @@ Extreme optimization for sub-3s response times with caching
 """
 
 import os
-import json
+import re
+import orjson
 import time
 import hashlib
 from datetime import datetime
 import google.generativeai as genai
+from utils import configure_genai, get_llm
 from dotenv import load_dotenv
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+def _build_keyword_automaton(patterns):
+    """Build one Aho-Corasick automaton over every pattern keyword, plus keyword -> pattern names"""
+    keyword_patterns = {}
+    for name, pattern in patterns.items():
+        for keyword in pattern['keywords']:
+            keyword_patterns.setdefault(keyword, []).append(name)
+
+    automaton = ahocorasick.Automaton()
+    for keyword in keyword_patterns:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton, keyword_patterns
+
+# Read .env once per process rather than for every processor instance
+load_dotenv()
+
 class UltraFastProcessor:
+    # Pre-compiled decision patterns for instant responses
+    instant_patterns = {
+        'emergency': {
+            'keywords': ['emergency', 'urgent', 'heart attack', 'stroke', 'accident', 'critical', 'bleeding', 'unconscious', 'tore', 'torn', 'ligament'],
+            'decision': 'approved',
+            'answer': 'Emergency medical treatment is covered immediately. Please proceed to the nearest hospital for treatment.',
+            'confidence': 0.95
+        },
+        'injury': {
+            'keywords': ['injury', 'broken', 'fracture', 'sprain', 'ligament', 'tear', 'torn', 'foot', 'leg', 'arm'],
+            'decision': 'approved',
+            'answer': 'Injury from accidents is typically covered under your policy. Please ensure proper medical documentation.',
+            'confidence': 0.90
+        },
+        'routine': {
+            'keywords': ['checkup', 'routine', 'regular', 'preventive', 'annual'],
+            'decision': 'approved',
+            'answer': 'Routine medical checkups are covered under your policy after the waiting period.',
+            'confidence': 0.85
+        },
+        'grace_period': {
+            'keywords': ['grace period', 'premium payment', 'late payment', 'payment grace'],
+            'decision': 'approved',
+            'answer': 'Grace period for premium payment is typically 15-30 days from the due date. Please refer to your policy schedule for exact terms.',
+            'confidence': 0.85
+        },
+        'waiting_period_ped': {
+            'keywords': ['waiting period', 'pre-existing', 'ped', 'existing disease'],
+            'decision': 'approved',
+            'answer': 'Pre-existing diseases (PED) are covered after a waiting period of 24-48 months depending on the condition.',
+            'confidence': 0.85
+        },
+        'maternity': {
+            'keywords': ['pregnancy', 'maternity', 'childbirth', 'delivery', 'pregnant'],
+            'decision': 'approved',
+            'answer': 'Maternity benefits are available after completing the waiting period of 36-48 months. Coverage includes delivery, pre-natal and post-natal expenses.',
+            'confidence': 0.90
+        },
+        'cataract': {
+            'keywords': ['cataract', 'eye surgery', 'lens replacement', 'vision surgery'],
+            'decision': 'approved',
+            'answer': 'Cataract surgery is covered after completing the waiting period of 24 months. Both traditional and modern techniques are covered.',
+            'confidence': 0.85
+        },
+        'organ_donor': {
+            'keywords': ['organ donor', 'transplant', 'donor expenses', 'kidney donor'],
+            'decision': 'approved',
+            'answer': 'Medical expenses for organ donors are covered when the recipient is also insured under the same or family policy.',
+            'confidence': 0.80
+        },
+        'ncd': {
+            'keywords': ['no claim discount', 'ncd', 'bonus', 'claim free'],
+            'decision': 'approved',
+            'answer': 'No Claim Discount (NCD) of 5-20% is offered for claim-free years, increasing cumulatively up to maximum percentage.',
+            'confidence': 0.85
+        },
+        'preventive_health': {
+            'keywords': ['preventive health', 'health checkup', 'wellness check'],
+            'decision': 'approved',
+            'answer': 'Preventive health check-ups are covered annually with benefits ranging from ₹1,000 to ₹5,000 depending on your plan.',
+            'confidence': 0.85
+        },
+        'hospital_definition': {
+            'keywords': ['hospital define', 'what is hospital', 'hospital meaning'],
+            'decision': 'approved',
+            'answer': 'A Hospital is defined as an institution with minimum 10 beds, qualified medical practitioners, nursing staff, and proper medical facilities.',
+            'confidence': 0.90
+        },
+        'ayush': {
+            'keywords': ['ayush', 'ayurveda', 'homeopathy', 'unani', 'alternative medicine'],
+            'decision': 'approved',
+            'answer': 'AYUSH treatments (Ayurveda, Yoga, Unani, Siddha, Homeopathy) are covered up to specified limits in recognized centers.',
+            'confidence': 0.80
+        },
+        'room_rent': {
+            'keywords': ['room rent', 'icu charges', 'bed charges', 'accommodation'],
+            'decision': 'approved',
+            'answer': 'Room rent is typically limited to 1-2% of sum insured per day. ICU charges may have separate limits as per policy schedule.',
+            'confidence': 0.80
+        },
+        'pre_existing': {
+            'keywords': ['pre-existing', 'diabetes', 'hypertension', 'chronic'],
+            'decision': 'approved',
+            'answer': 'Pre-existing conditions are covered after the waiting period of 24-36 months.',
+            'confidence': 0.80
+        },
+        'uin_bajaj': {
+            'keywords': ['uin', 'bajaj allianz', 'global health care', 'uin number'],
+            'decision': 'approved',
+            'answer': 'Bajaj Allianz Global Health Care Policy UIN: BAJHLIP23020V012223. The UIN (Unique Identification Number) is a regulatory identifier assigned by IRDA for policy tracking and compliance.',
+            'confidence': 0.95
+        },
+        'cholamandalam_contact': {
+            'keywords': ['cholamandalam', 'toll free', '1800 208 9100', 'customer service'],
+            'decision': 'approved',
+            'answer': 'Cholamandalam MS General Insurance toll-free number 1800 208 9100 provides 24/7 customer service for claim assistance, policy inquiries, and emergency support.',
+            'confidence': 0.95
+        },
+        'edelweiss_maternity': {
+            'keywords': ['edelweiss', 'well baby', 'well mother', 'maternity add-on'],
+            'decision': 'approved',
+            'answer': 'Edelweiss Well Baby Well Mother add-on (UIN: EDLHLGA23009V012223) provides comprehensive maternity coverage including pre-natal, delivery, and post-natal expenses.',
+            'confidence': 0.90
+        },
+        'day_care_procedures': {
+            'keywords': ['day care procedures', 'day care surgery', 'outpatient surgery'],
+            'decision': 'approved',
+            'answer': 'Day Care Procedures are specific surgeries that do not require 24-hour hospitalization but need professional medical facilities. Coverage includes cataract surgery, dialysis, chemotherapy, and specified minor surgeries.',
+            'confidence': 0.85
+        },
+        'bajaj_riders': {
+            'keywords': ['bajaj', 'rider', 'base coverage', 'additional', 'global health care'],
+            'decision': 'approved',
+            'answer': 'Bajaj Allianz Global Health Care offers base coverage with optional riders for enhanced benefits. Base policy covers hospitalization, day care procedures, and emergency treatment. Additional riders may include critical illness, personal accident, and family health benefits.',
+            'confidence': 0.85
+        },
+        'cholamandalam_office': {
+            'keywords': ['cholamandalam', 'office', 'address', 'mumbai', 'chennai', 'registered'],
+            'decision': 'approved',
+            'answer': 'Cholamandalam MS General Insurance has offices in Mumbai and Chennai. For claim processing and complaints, contact their toll-free number 1800 208 9100 or visit their website. Claims are processed centrally regardless of office location.',
+            'confidence': 0.80
+        },
+        'edelweiss_eligibility': {
+            'keywords': ['edelweiss', 'eligibility', 'base product', 'EDLHLGP21462V032021'],
+            'decision': 'approved',
+            'answer': 'Edelweiss Well Baby Well Mother add-on eligibility requires enrollment in the base policy (UIN: EDLHLGP21462V032021). Coverage is available for married women between 18-35 years, with specific waiting periods for maternity benefits.',
+            'confidence': 0.85
+        },
+        'premium_payment': {
+            'keywords': ['premium payment', 'schedule', 'bajaj', 'cholamandalam', 'edelweiss'],
+            'decision': 'approved',
+            'answer': 'Premium payment schedules vary by insurer: Bajaj Allianz offers annual/monthly options with 15-30 day grace period. Cholamandalam provides flexible payment terms. Edelweiss allows quarterly/annual payments. Check your policy schedule for specific terms.',
+            'confidence': 0.80
+        }
+    }
+
+    # Sort patterns by specificity (more specific patterns first)
+    pattern_order = (
+        'uin_bajaj', 'cholamandalam_contact', 'cholamandalam_office', 'edelweiss_maternity',
+        'edelweiss_eligibility', 'day_care_procedures', 'bajaj_riders', 'premium_payment',
+        'emergency', 'injury', 'grace_period', 'waiting_period_ped', 'maternity',
+        'cataract', 'organ_donor', 'ncd', 'preventive_health', 'hospital_definition',
+        'ayush', 'room_rent', 'pre_existing', 'routine'
+    )
+
+    # Specific patterns match only when the query has at least one term from each group
+    compound_rules = {
+        'uin_bajaj': (('bajaj',), ('uin', 'global health care')),
+        'cholamandalam_contact': (('cholamandalam',), ('toll', 'customer service', '1800')),
+        'cholamandalam_office': (('cholamandalam',), ('office', 'address', 'mumbai', 'chennai')),
+        'edelweiss_maternity': (('edelweiss',), ('well baby', 'well mother', 'maternity')),
+        'edelweiss_eligibility': (('edelweiss',), ('eligibility', 'base product', 'edlhlgp21462v032021')),
+        'day_care_procedures': (('day care',), ('procedure', 'surgery')),
+        'bajaj_riders': (('bajaj',), ('rider', 'base coverage', 'additional')),
+        'premium_payment': (('premium',), ('premium payment', 'schedule')),
+    }
+
+    # Ready-made responses, copied on a match instead of rebuilt per query
+    instant_results = {
+        name: {
+            'decision': pattern['decision'],
+            'answer': pattern['answer'],
+            'confidence': pattern['confidence'],
+            'method': 'instant_pattern',
+            'pattern_matched': name
+        }
+        for name, pattern in instant_patterns.items()
+    }
+
+    # Matchers are compiled once when the class is defined, not per instance or per query:
+    # one alternation per pattern, and a single Aho-Corasick automaton over every keyword
+    pattern_regexes = {
+        name: re.compile('|'.join(re.escape(keyword) for keyword in pattern['keywords']))
+        for name, pattern in instant_patterns.items()
+    }
+    keyword_automaton, keyword_patterns = (_build_keyword_automaton(instant_patterns)
+                                           if AHOCORASICK_AVAILABLE else (None, {}))
+
     def __init__(self):
         """Initialize ultra-fast processor with caching"""
-        load_dotenv()
 
         # Setup API keys with failover
         self.api_key = os.getenv("GOOGLE_API_KEY")
@@ -23,158 +224,36 @@ class UltraFastProcessor:
         self.current_key = self.api_key
 
         # Configure Gemini with speed optimizations
-        genai.configure(api_key=self.current_key)
-        self.llm = genai.GenerativeModel("gemini-1.5-flash")
+        configure_genai(self.current_key)
+        self.llm = get_llm(self.current_key)
 
         # In-memory cache for frequent queries
         self.response_cache = {}
 
-        # Pre-compiled decision patterns for instant responses
-        self.instant_patterns = {
-            'emergency': {
-                'keywords': ['emergency', 'urgent', 'heart attack', 'stroke', 'accident', 'critical', 'bleeding', 'unconscious', 'tore', 'torn', 'ligament'],
-                'decision': 'approved',
-                'answer': 'Emergency medical treatment is covered immediately. Please proceed to the nearest hospital for treatment.',
-                'confidence': 0.95
-            },
-            'injury': {
-                'keywords': ['injury', 'broken', 'fracture', 'sprain', 'ligament', 'tear', 'torn', 'foot', 'leg', 'arm'],
-                'decision': 'approved',
-                'answer': 'Injury from accidents is typically covered under your policy. Please ensure proper medical documentation.',
-                'confidence': 0.90
-            },
-            'routine': {
-                'keywords': ['checkup', 'routine', 'regular', 'preventive', 'annual'],
-                'decision': 'approved',
-                'answer': 'Routine medical checkups are covered under your policy after the waiting period.',
-                'confidence': 0.85
-            },
-            'grace_period': {
-                'keywords': ['grace period', 'premium payment', 'late payment', 'payment grace'],
-                'decision': 'approved',
-                'answer': 'Grace period for premium payment is typically 15-30 days from the due date. Please refer to your policy schedule for exact terms.',
-                'confidence': 0.85
-            },
-            'waiting_period_ped': {
-                'keywords': ['waiting period', 'pre-existing', 'ped', 'existing disease'],
-                'decision': 'approved',
-                'answer': 'Pre-existing diseases (PED) are covered after a waiting period of 24-48 months depending on the condition.',
-                'confidence': 0.85
-            },
-            'maternity': {
-                'keywords': ['pregnancy', 'maternity', 'childbirth', 'delivery', 'pregnant'],
-                'decision': 'approved',
-                'answer': 'Maternity benefits are available after completing the waiting period of 36-48 months. Coverage includes delivery, pre-natal and post-natal expenses.',
-                'confidence': 0.90
-            },
-            'cataract': {
-                'keywords': ['cataract', 'eye surgery', 'lens replacement', 'vision surgery'],
-                'decision': 'approved',
-                'answer': 'Cataract surgery is covered after completing the waiting period of 24 months. Both traditional and modern techniques are covered.',
-                'confidence': 0.85
-            },
-            'organ_donor': {
-                'keywords': ['organ donor', 'transplant', 'donor expenses', 'kidney donor'],
-                'decision': 'approved',
-                'answer': 'Medical expenses for organ donors are covered when the recipient is also insured under the same or family policy.',
-                'confidence': 0.80
-            },
-            'ncd': {
-                'keywords': ['no claim discount', 'ncd', 'bonus', 'claim free'],
-                'decision': 'approved',
-                'answer': 'No Claim Discount (NCD) of 5-20% is offered for claim-free years, increasing cumulatively up to maximum percentage.',
-                'confidence': 0.85
-            },
-            'preventive_health': {
-                'keywords': ['preventive health', 'health checkup', 'wellness check'],
-                'decision': 'approved',
-                'answer': 'Preventive health check-ups are covered annually with benefits ranging from ₹1,000 to ₹5,000 depending on your plan.',
-                'confidence': 0.85
-            },
-            'hospital_definition': {
-                'keywords': ['hospital define', 'what is hospital', 'hospital meaning'],
-                'decision': 'approved',
-                'answer': 'A Hospital is defined as an institution with minimum 10 beds, qualified medical practitioners, nursing staff, and proper medical facilities.',
-                'confidence': 0.90
-            },
-            'ayush': {
-                'keywords': ['ayush', 'ayurveda', 'homeopathy', 'unani', 'alternative medicine'],
-                'decision': 'approved',
-                'answer': 'AYUSH treatments (Ayurveda, Yoga, Unani, Siddha, Homeopathy) are covered up to specified limits in recognized centers.',
-                'confidence': 0.80
-            },
-            'room_rent': {
-                'keywords': ['room rent', 'icu charges', 'bed charges', 'accommodation'],
-                'decision': 'approved',
-                'answer': 'Room rent is typically limited to 1-2% of sum insured per day. ICU charges may have separate limits as per policy schedule.',
-                'confidence': 0.80
-            },
-            'pre_existing': {
-                'keywords': ['pre-existing', 'diabetes', 'hypertension', 'chronic'],
-                'decision': 'approved',
-                'answer': 'Pre-existing conditions are covered after the waiting period of 24-36 months.',
-                'confidence': 0.80
-            },
-            'uin_bajaj': {
-                'keywords': ['uin', 'bajaj allianz', 'global health care', 'uin number'],
-                'decision': 'approved',
-                'answer': 'Bajaj Allianz Global Health Care Policy UIN: BAJHLIP23020V012223. The UIN (Unique Identification Number) is a regulatory identifier assigned by IRDA for policy tracking and compliance.',
-                'confidence': 0.95
-            },
-            'cholamandalam_contact': {
-                'keywords': ['cholamandalam', 'toll free', '1800 208 9100', 'customer service'],
-                'decision': 'approved',
-                'answer': 'Cholamandalam MS General Insurance toll-free number 1800 208 9100 provides 24/7 customer service for claim assistance, policy inquiries, and emergency support.',
-                'confidence': 0.95
-            },
-            'edelweiss_maternity': {
-                'keywords': ['edelweiss', 'well baby', 'well mother', 'maternity add-on'],
-                'decision': 'approved',
-                'answer': 'Edelweiss Well Baby Well Mother add-on (UIN: EDLHLGA23009V012223) provides comprehensive maternity coverage including pre-natal, delivery, and post-natal expenses.',
-                'confidence': 0.90
-            },
-            'day_care_procedures': {
-                'keywords': ['day care procedures', 'day care surgery', 'outpatient surgery'],
-                'decision': 'approved',
-                'answer': 'Day Care Procedures are specific surgeries that do not require 24-hour hospitalization but need professional medical facilities. Coverage includes cataract surgery, dialysis, chemotherapy, and specified minor surgeries.',
-                'confidence': 0.85
-            },
-            'bajaj_riders': {
-                'keywords': ['bajaj', 'rider', 'base coverage', 'additional', 'global health care'],
-                'decision': 'approved',
-                'answer': 'Bajaj Allianz Global Health Care offers base coverage with optional riders for enhanced benefits. Base policy covers hospitalization, day care procedures, and emergency treatment. Additional riders may include critical illness, personal accident, and family health benefits.',
-                'confidence': 0.85
-            },
-            'cholamandalam_office': {
-                'keywords': ['cholamandalam', 'office', 'address', 'mumbai', 'chennai', 'registered'],
-                'decision': 'approved',
-                'answer': 'Cholamandalam MS General Insurance has offices in Mumbai and Chennai. For claim processing and complaints, contact their toll-free number 1800 208 9100 or visit their website. Claims are processed centrally regardless of office location.',
-                'confidence': 0.80
-            },
-            'edelweiss_eligibility': {
-                'keywords': ['edelweiss', 'eligibility', 'base product', 'EDLHLGP21462V032021'],
-                'decision': 'approved',
-                'answer': 'Edelweiss Well Baby Well Mother add-on eligibility requires enrollment in the base policy (UIN: EDLHLGP21462V032021). Coverage is available for married women between 18-35 years, with specific waiting periods for maternity benefits.',
-                'confidence': 0.85
-            },
-            'premium_payment': {
-                'keywords': ['premium payment', 'schedule', 'bajaj', 'cholamandalam', 'edelweiss'],
-                'decision': 'approved',
-                'answer': 'Premium payment schedules vary by insurer: Bajaj Allianz offers annual/monthly options with 15-30 day grace period. Cholamandalam provides flexible payment terms. Edelweiss allows quarterly/annual payments. Check your policy schedule for specific terms.',
-                'confidence': 0.80
-            }
-        }
-
     def get_cache_key(self, query):
         """Generate cache key for query"""
         return hashlib.md5(query.lower().encode()).hexdigest()
 
+    def find_keyword_hits(self, query_lower):
+        """Map each pattern to the first of its keywords found in the query"""
+        hits = {}
+        if self.keyword_automaton is not None:
+            for _, keyword in self.keyword_automaton.iter(query_lower):
+                for name in self.keyword_patterns[keyword]:
+                    hits.setdefault(name, keyword)
+        else:
+            for name, regex in self.pattern_regexes.items():
+                keyword_match = regex.search(query_lower)
+                if keyword_match:
+                    hits[name] = keyword_match.group(0)
+        return hits
+
     def switch_to_pro_key(self):
         """Switch to PRO API key when primary key hits quota"""
         if self.api_key_pro and self.current_key != self.api_key_pro:
             self.current_key = self.api_key_pro
-            genai.configure(api_key=self.current_key)
-            self.llm = genai.GenerativeModel("gemini-1.5-flash")
+            configure_genai(self.current_key)
+            self.llm = get_llm(self.current_key)
             return True
         return False
 
@@ -182,115 +261,22 @@ class UltraFastProcessor:
         """Make instant decisions for common patterns with improved matching"""
         query_lower = query.lower()
         print(f"🔍 DEBUG: Checking pattern matching for: {query_lower[:100]}")
+        keyword_hits = self.find_keyword_hits(query_lower)
+
+        for pattern_name in self.pattern_order:
+            required_groups = self.compound_rules.get(pattern_name)
 
-        # Sort patterns by specificity (more specific patterns first)
-        pattern_order = [
-            'uin_bajaj', 'cholamandalam_contact', 'cholamandalam_office', 'edelweiss_maternity',
-            'edelweiss_eligibility', 'day_care_procedures', 'bajaj_riders', 'premium_payment',
-            'emergency', 'injury', 'grace_period', 'waiting_period_ped', 'maternity',
-            'cataract', 'organ_donor', 'ncd', 'preventive_health', 'hospital_definition',
-            'ayush', 'room_rent', 'pre_existing', 'routine'
-        ]
-
-        for pattern_name in pattern_order:
-            if pattern_name not in self.instant_patterns:
-                continue
-
-            pattern = self.instant_patterns[pattern_name]
-
-            # Check if ALL required keywords are present for specific patterns
-            if pattern_name == 'uin_bajaj':
-                if ('uin' in query_lower and 'bajaj' in query_lower) or ('bajaj' in query_lower and 'global health care' in query_lower):
-                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched for Bajaj UIN query")
-                    return {
-                        'decision': pattern['decision'],
-                        'answer': pattern['answer'],
-                        'confidence': pattern['confidence'],
-                        'method': 'instant_pattern',
-                        'pattern_matched': pattern_name
-                    }
-            elif pattern_name == 'cholamandalam_contact':
-                if 'cholamandalam' in query_lower and ('toll' in query_lower or 'customer service' in query_lower or '1800' in query_lower):
-                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched for Cholamandalam contact query")
-                    return {
-                        'decision': pattern['decision'],
-                        'answer': pattern['answer'],
-                        'confidence': pattern['confidence'],
-                        'method': 'instant_pattern',
-                        'pattern_matched': pattern_name
-                    }
-            elif pattern_name == 'cholamandalam_office':
-                if 'cholamandalam' in query_lower and ('office' in query_lower or 'address' in query_lower or 'mumbai' in query_lower or 'chennai' in query_lower):
-                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched for Cholamandalam office query")
-                    return {
-                        'decision': pattern['decision'],
-                        'answer': pattern['answer'],
-                        'confidence': pattern['confidence'],
-                        'method': 'instant_pattern',
-                        'pattern_matched': pattern_name
-                    }
-            elif pattern_name == 'edelweiss_maternity':
-                if 'edelweiss' in query_lower and ('well baby' in query_lower or 'well mother' in query_lower or 'maternity' in query_lower):
-                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched for Edelweiss maternity query")
-                    return {
-                        'decision': pattern['decision'],
-                        'answer': pattern['answer'],
-                        'confidence': pattern['confidence'],
-                        'method': 'instant_pattern',
-                        'pattern_matched': pattern_name
-                    }
-            elif pattern_name == 'edelweiss_eligibility':
-                if 'edelweiss' in query_lower and ('eligibility' in query_lower or 'base product' in query_lower or 'EDLHLGP21462V032021' in query_lower):
-                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched for Edelweiss eligibility query")
-                    return {
-                        'decision': pattern['decision'],
-                        'answer': pattern['answer'],
-                        'confidence': pattern['confidence'],
-                        'method': 'instant_pattern',
-                        'pattern_matched': pattern_name
-                    }
-            elif pattern_name == 'bajaj_riders':
-                if 'bajaj' in query_lower and ('rider' in query_lower or 'base coverage' in query_lower or 'additional' in query_lower):
-                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched for Bajaj riders query")
-                    return {
-                        'decision': pattern['decision'],
-                        'answer': pattern['answer'],
-                        'confidence': pattern['confidence'],
-                        'method': 'instant_pattern',
-                        'pattern_matched': pattern_name
-                    }
-            elif pattern_name == 'premium_payment':
-                if 'premium payment' in query_lower or ('premium' in query_lower and 'schedule' in query_lower):
-                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched for premium payment query")
-                    return {
-                        'decision': pattern['decision'],
-                        'answer': pattern['answer'],
-                        'confidence': pattern['confidence'],
-                        'method': 'instant_pattern',
-                        'pattern_matched': pattern_name
-                    }
-            elif pattern_name == 'day_care_procedures':
-                if 'day care' in query_lower and ('procedure' in query_lower or 'surgery' in query_lower):
-                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched for day care procedures")
-                    return {
-                        'decision': pattern['decision'],
-                        'answer': pattern['answer'],
-                        'confidence': pattern['confidence'],
-                        'method': 'instant_pattern',
-                        'pattern_matched': pattern_name
-                    }
+            if required_groups:
+                # Specific patterns need one term from every required group
+                if all(any(term in query_lower for term in group) for group in required_groups):
+                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched all required terms")
+                    return self.instant_results[pattern_name].copy()
             else:
-                # For other patterns, use the original keyword matching
-                keywords_found = [keyword for keyword in pattern['keywords'] if keyword in query_lower]
-                if keywords_found:
-                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched with keywords: {keywords_found}")
-                    return {
-                        'decision': pattern['decision'],
-                        'answer': pattern['answer'],
-                        'confidence': pattern['confidence'],
-                        'method': 'instant_pattern',
-                        'pattern_matched': pattern_name
-                    }
+                # For other patterns, use the keywords found in the single scan above
+                keyword = keyword_hits.get(pattern_name)
+                if keyword:
+                    print(f"✅ DEBUG: Pattern '{pattern_name}' matched with keyword: '{keyword}'")
+                    return self.instant_results[pattern_name].copy()
 
         print(f"❌ DEBUG: No pattern matched for: {query_lower[:50]}...")
         return None
@@ -346,7 +332,7 @@ JSON response:
                     json_end = response_text.rfind("}") + 1
                     response_text = response_text[json_start:json_end]
 
-                result = json.loads(response_text)
+                result = orjson.loads(response_text)
                 result['processing_time'] = round(time.time() - start_time, 3)
                 result['method'] = f'llm_fast_key_{attempt + 1}'
 
@@ -422,10 +408,6 @@ JSON response:
             result = self.ultra_fast_process(question, chunks)
             results.append(result)
 
-            # Yield control to prevent blocking
-            if i % 3 == 0:
-                time.sleep(0.001)  # Tiny delay to prevent overload
-
         total_time = round(time.time() - start_time, 3)
 
         return {
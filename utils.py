@@ -1,9 +1,28 @@
 import os
+import functools
+import threading
 import PyPDF2
 from docx import Document
 from email import policy
 from email.parser import BytesParser
 import fitz  # PyMuPDF for better PDF text extraction
+import google.generativeai as genai
+
+@functools.lru_cache(maxsize=None)
+def get_llm(api_key):
+    """One Gemini model per API key, shared by every processor in the process"""
+    return genai.GenerativeModel("gemini-1.5-flash")
+
+_configured_api_key = None
+_configure_lock = threading.Lock()
+
+def configure_genai(api_key):
+    """Point the Gemini SDK at api_key, skipping the client reset when it already is"""
+    global _configured_api_key
+    with _configure_lock:
+        if api_key != _configured_api_key:
+            genai.configure(api_key=api_key)
+            _configured_api_key = api_key
 
 def extract_text_from_pdf(file_path):
     """Extract text from PDF using PyMuPDF for better quality"""
@@ -24,6 +43,28 @@ def extract_text_from_pdf(file_path):
                 text += page.extract_text()
         return text
 
+def iter_text_from_pdf(file_path):
+    """Yield PDF text one page at a time so the whole document is never held in memory"""
+    try:
+        # Try PyMuPDF first (better text extraction)
+        doc = fitz.open(file_path)
+    except:
+        doc = None
+
+    if doc is not None:
+        try:
+            for page in doc:
+                yield page.get_text()
+        finally:
+            doc.close()
+        return
+
+    # Fallback to PyPDF2
+    with open(file_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f)
+        for page in reader.pages:
+            yield page.extract_text()
+
 def extract_text_from_docx(file_path):
     doc = Document(file_path)
     return "\n".join([para.text for para in doc.paragraphs])
@@ -50,6 +91,14 @@ def extract_text_from_file(file_path):
     else:
         raise ValueError(f"Unsupported file format: {ext}")
 
+def iter_text_from_file(file_path):
+    """Yield a document's text in pieces (pages for PDFs, the whole text otherwise)"""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".pdf":
+        yield from iter_text_from_pdf(file_path)
+    else:
+        yield extract_text_from_file(file_path)
+
 def process_multiple_documents(docs_folder="docs"):
     """
     Process multiple policy documents from a folder and return combined text chunks
@@ -82,29 +131,36 @@ def process_multiple_documents(docs_folder="docs"):
 
     print(f"Processing {len(files)} policy documents:")
 
-    for filename, file_path in files:
+    for filename, chunks, error in (load_and_chunk_file(file, policy_chunking=True) for file in files):
         print(f"  - {filename}")
-        try:
-            # Extract text from each document
-            text = extract_text_from_file(file_path)
-
-            # Chunk the text with improved chunking for policy documents
-            chunks = chunk_text_for_policy(text)
+        if error:
+            print(f"    → Error processing {filename}: {error}")
+            continue
 
-            # Add source information to each chunk
-            for chunk in chunks:
-                all_chunks.append(chunk)
-                document_sources.append(filename)
+        # Add source information to each chunk
+        all_chunks.extend(chunks)
+        document_sources.extend([filename] * len(chunks))
 
-            print(f"    → {len(chunks)} chunks extracted")
-
-        except Exception as e:
-            print(f"    → Error processing {filename}: {e}")
-            continue
+        print(f"    → {len(chunks)} chunks extracted")
 
     print(f"\nTotal chunks across all policy documents: {len(all_chunks)}")
     return all_chunks, document_sources
 
+def load_and_chunk_file(file, policy_chunking=False):
+    """
+    Extract and chunk one (filename, file_path); safe to run in a worker process
+    policy_chunking uses chunk_text_for_policy on the whole text, otherwise the text is
+    chunked page by page with iter_chunk_text
+    Returns (filename, chunks, error) so one bad file doesn't stop the others
+    """
+    filename, file_path = file
+    try:
+        if policy_chunking:
+            return filename, chunk_text_for_policy(extract_text_from_file(file_path)), None
+        return filename, list(iter_chunk_text(iter_text_from_file(file_path))), None
+    except Exception as e:
+        return filename, [], str(e)
+
 def chunk_text_for_policy(text, max_length=600):
     """
     Improved text chunking specifically for policy documents
@@ -180,6 +236,13 @@ def chunk_text(text, max_length=500):
     """
     Improved text chunking that tries to preserve clause boundaries
     """
+    return list(iter_chunk_text([text], max_length))
+
+def iter_chunk_text(text_pieces, max_length=500):
+    """
+    Streaming version of chunk_text: consumes text piece by piece (e.g. PDF pages)
+    and yields the same chunks chunk_text would produce for the joined text
+    """
     # First try to split by common clause indicators
     clause_indicators = [
         '\n\n',  # Paragraph breaks
@@ -192,20 +255,28 @@ def chunk_text(text, max_length=500):
         'Definition '
     ]
 
-    # Split text into sentences first
-    sentences = text.replace('\n', ' ').split('. ')
-
-    chunks = []
     current_chunk = []
     current_length = 0
-
-    for sentence in sentences:
+    pending = ""
+
+    def sentences():
+        # Split text into sentences, carrying a trailing partial sentence over to the next piece
+        nonlocal pending
+        for piece in text_pieces:
+            parts = (pending + piece.replace('\n', ' ')).split('. ')
+            pending = parts.pop()
+            yield from parts
+        yield pending
+
+    for sentence in sentences():
         words = sentence.split()
         sentence_length = len(words)
 
         # If adding this sentence would exceed max_length, save current chunk
         if current_length + sentence_length > max_length and current_chunk:
-            chunks.append(' '.join(current_chunk) + '.')
+            # Filter out very short chunks (likely noise)
+            if current_length > 10:
+                yield ' '.join(current_chunk) + '.'
             current_chunk = []
             current_length = 0
 
@@ -213,10 +284,5 @@ def chunk_text(text, max_length=500):
         current_length += sentence_length
 
     # Add the last chunk if it exists
-    if current_chunk:
-        chunks.append(' '.join(current_chunk))
-
-    # Filter out very short chunks (likely noise)
-    chunks = [chunk for chunk in chunks if len(chunk.split()) > 10]
-
-    return chunks
\ No newline at end of file
+    if current_chunk and current_length > 10:
+        yield ' '.join(current_chunk)
\ No newline at end of file